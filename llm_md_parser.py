@@ -1,5 +1,42 @@
 import re
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple
+
+# One template line: a worksheet separator (- Section) or a header
+# (# Title [cardinality] $ | notes). [^\S\n] is whitespace within a line.
+# Header lines the fast branch does not accept fall through to 'other' so
+# _parse_header_line can report them.
+_TEMPLATE_RE = re.compile(
+    r'^[^\S\n]*(?:'
+    r'- [^\S\n]*(?P<sep>\S[^\n]*)'
+    r'|(?P<hashes>#+)(?!#)[^\S\n]*(?P<name>[^|\[\$\s][^|\[\$\n]*)'
+    r'(?:(?P<card>\[[^\]\n]*\])[^\S\n]*)?'
+    r'(?:(?P<req>\$)[^\S\n]*)?'
+    r'(?:\|[^\S\n]*(?P<notes>[^\n]*))?'
+    r'|(?P<other>#[^\n]*)'
+    r')$',
+    re.MULTILINE,
+)
+# Header prefixes by level; deeper levels are built on demand
+_HASHES = tuple('#' * i for i in range(8))
+# Common fixed cardinalities, keyed by their digits
+_FIXED_COUNTS = {str(i): i for i in range(16)}
+
+class ParsedHeader:
+    """A template header: level, title, flattened cardinality, required flag and notes."""
+    __slots__ = ('level', 'name', 'card_type', 'card_min', 'card_max', 'card_count',
+                 'required', 'notes', 'children')
+    
+    def __init__(self, level: int, name: str, required: bool, notes: str) -> None:
+        self.level = level
+        self.name = name
+        self.card_type = 'fixed'
+        self.card_min: Optional[int] = None
+        self.card_max: Optional[int] = None
+        self.card_count: Optional[int] = None
+        self.required = required
+        self.notes = notes
+        self.children: List['ParsedHeader'] = []
 
 def parse_llm_md(template: str, section: Optional[str] = None, quantities: Optional[Dict[str, int]] = None) -> str:
     """
@@ -13,12 +50,20 @@ def parse_llm_md(template: str, section: Optional[str] = None, quantities: Optio
     
     Returns:
         Generated worksheet as markdown string
+    
+    Results are cached per (template, section, quantities), so regenerating
+    the same worksheet skips parsing entirely.
     """
     if quantities is None:
         quantities = {}
     
-    lines = template.strip().split('\n')
-    parsed_structure = _parse_template_structure(lines)
+    return _parse_llm_md_cached(template, section, frozenset(quantities.items()))
+
+@lru_cache(maxsize=128)
+def _parse_llm_md_cached(template: str, section: Optional[str], quantity_items: FrozenSet[Tuple[str, int]]) -> str:
+    """Cached implementation of parse_llm_md keyed on hashable arguments."""
+    quantities = dict(quantity_items)
+    parsed_structure = _parse_template_structure(template)
     
     if section:
         # Find and generate only the specified section
@@ -27,210 +72,241 @@ def parse_llm_md(template: str, section: Optional[str] = None, quantities: Optio
             raise ValueError(f"Section '{section}' not found in template")
         return _generate_worksheet(section_structure, quantities)
     else:
-        # Generate complete worksheet (excluding worksheet separators)
-        content_structure = _filter_content_structure(parsed_structure)
-        return _generate_worksheet(content_structure, quantities)
+        # Generate complete worksheet, with worksheet sections as H1 headers
+        return _generate_worksheet(parsed_structure, quantities)
 
-def _parse_template_structure(lines: List[str]) -> List[Dict[str, Any]]:
+def _parse_template_structure(template: str) -> List[Any]:
     """Parse template lines into structured data."""
     structure = []
     current_section = None
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        if line.startswith('- '):
+    for match in _TEMPLATE_RE.finditer(template):
+        section_name, hashes, name, card, req, notes, other = match.groups()
+        if section_name is not None:
             # Worksheet section separator
-            section_name = line[2:].strip()
             current_section = {
                 'type': 'worksheet_section',
-                'name': section_name,
+                'name': section_name.rstrip(),
                 'content': []
             }
             structure.append(current_section)
-        elif line.startswith('#'):
-            # Header line
-            parsed_header = _parse_header_line(line)
-            
-            if current_section and current_section['type'] == 'worksheet_section':
-                current_section['content'].append(parsed_header)
-            else:
-                # No worksheet section, add directly to structure
-                structure.append(parsed_header)
+            continue
+        
+        # Header line
+        if hashes is not None:
+            parsed_header = _make_header(
+                len(hashes),
+                name.rstrip(),
+                card or '[1]',
+                req is not None,
+                (notes or '').rstrip()
+            )
+        else:
+            parsed_header = _parse_header_line(other.rstrip())
+        
+        if current_section and current_section['type'] == 'worksheet_section':
+            current_section['content'].append(parsed_header)
+        else:
+            # No worksheet section, add directly to structure
+            structure.append(parsed_header)
     
     return structure
 
-def _parse_header_line(line: str) -> Dict[str, Any]:
+def _parse_header_line(line: str) -> ParsedHeader:
     """Parse a single header line into structured data."""
-    # Count header level
-    level = 0
-    for char in line:
-        if char == '#':
-            level += 1
-        else:
-            break
+    # Count and remove header markers
+    content = line.lstrip('#')
+    level = len(line) - len(content)
+    content = content.strip()
     
-    # Remove header markers
-    content = line[level:].strip()
+    # Extract components: Title [cardinality] $ | notes
+    # The title runs up to the first '[', '$' or '|'
+    end = len(content)
+    for marker in '[$|':
+        idx = content.find(marker, 0, end)
+        if idx != -1:
+            end = idx
+    
+    if end == 0:
+        raise ValueError(f"Invalid header format: {line}")
     
-    # Extract components using regex
-    # Pattern: Title [cardinality] $ | notes
-    pattern = r'^([^|\[\$]+?)(?:\s*(\[[^\]]*\]))?(?:\s*(\$))?(?:\s*\|\s*(.*))?$'
-    match = re.match(pattern, content)
+    name = content[:end].strip()
+    rest = content[end:]
     
-    if not match:
+    cardinality_str = '[1]'
+    if rest.startswith('['):
+        close = rest.find(']')
+        if close == -1:
+            raise ValueError(f"Invalid header format: {line}")
+        cardinality_str = rest[:close + 1]
+        rest = rest[close + 1:].lstrip()
+    
+    required = rest.startswith('$')
+    if required:
+        rest = rest[1:].lstrip()
+    
+    notes = ''
+    if rest.startswith('|'):
+        notes = rest[1:].lstrip()
+    elif rest:
         raise ValueError(f"Invalid header format: {line}")
     
-    name = match.group(1).strip()
-    cardinality_str = match.group(2) or '[1]'
-    required = match.group(3) is not None
-    notes = match.group(4) or ''
-    
-    # Parse cardinality
-    cardinality = _parse_cardinality(cardinality_str)
-    
-    return {
-        'type': 'header',
-        'level': level,
-        'name': name,
-        'cardinality': cardinality,
-        'required': required,
-        'notes': notes,
-        'children': []
-    }
+    return _make_header(level, name, cardinality_str, required, notes)
+
+def _make_header(level: int, name: str, cardinality_str: str, required: bool, notes: str) -> ParsedHeader:
+    """Build the structured data for a parsed header."""
+    header = ParsedHeader(level, name, required, notes)
+    _parse_cardinality(header, cardinality_str)
+    return header
 
-def _parse_cardinality(cardinality_str: str) -> Dict[str, Any]:
-    """Parse cardinality notation like [1], [*], [3-5]."""
+def _parse_cardinality(header: ParsedHeader, cardinality_str: str) -> None:
+    """Parse cardinality notation like [1], [*], [3-5] into the header."""
+    # Fast paths for the most common notations ('[1]' is also the default)
+    if cardinality_str == '[1]':
+        header.card_count = 1
+        return
+    if cardinality_str == '[*]':
+        header.card_type = 'unlimited'
+        header.card_min = 0
+        return
+    
     cardinality_str = cardinality_str.strip('[]')
     
-    if cardinality_str == '*':
-        return {'type': 'unlimited', 'min': 0, 'max': None}
+    count = _FIXED_COUNTS.get(cardinality_str)
+    if count is not None:
+        header.card_count = count
+    elif cardinality_str == '*':
+        header.card_type = 'unlimited'
+        header.card_min = 0
     elif cardinality_str.isdigit():
-        count = int(cardinality_str)
-        return {'type': 'fixed', 'count': count}
+        header.card_count = int(cardinality_str)
     elif '-' in cardinality_str:
         min_val, max_val = cardinality_str.split('-')
-        return {'type': 'range', 'min': int(min_val), 'max': int(max_val)}
+        header.card_type = 'range'
+        header.card_min = int(min_val)
+        header.card_max = int(max_val)
     else:
         raise ValueError(f"Invalid cardinality format: {cardinality_str}")
 
-def _find_section_structure(structure: List[Dict[str, Any]], section_name: str) -> Optional[List[Dict[str, Any]]]:
+def _find_section_structure(structure: List[Any], section_name: str) -> Optional[List[ParsedHeader]]:
     """Find content for a specific worksheet section."""
     for item in structure:
-        if item.get('type') == 'worksheet_section' and item.get('name') == section_name:
+        if isinstance(item, dict) and item['name'] == section_name:
             return item['content']
     return None
 
-def _filter_content_structure(structure: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Return structure as-is since we now want to include worksheet sections as H1 headers."""
-    return structure
-
-def _generate_worksheet(structure: List[Dict[str, Any]], quantities: Dict[str, int]) -> str:
+def _generate_worksheet(structure: List[Any], quantities: Dict[str, int]) -> str:
     """Generate worksheet markdown from parsed structure."""
     result = []
+    path: List[str] = []  # Shared by _generate_item_output, which restores it
     
     # Process structure including worksheet sections
     for item in structure:
-        if item.get('type') == 'worksheet_section':
+        if isinstance(item, dict):
             # Add line break above, H1, then horizontal rule below
             if result:  # Only add line break above if there's already content
-                result.append('')
-            result.append(f"# {item['name']}")
-            result.append('---')
+                result.extend(('', f"# {item['name']}", '---'))
+            else:
+                result.extend((f"# {item['name']}", '---'))
             
             # Build hierarchical structure for section content
             hierarchy = _build_hierarchy(item['content'])
             
             # Generate output for section content
             for content_item in hierarchy:
-                _generate_item_output(content_item, result, quantities, [])
-        elif item.get('type') == 'header':
+                _generate_item_output(content_item, result, quantities, path)
+        else:
             # Direct header (not in a worksheet section)
-            _generate_item_output(item, result, quantities, [])
+            _generate_item_output(item, result, quantities, path)
     
     return '\n'.join(result)
 
-def _build_hierarchy(structure: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _build_hierarchy(structure: List[ParsedHeader]) -> List[ParsedHeader]:
     """Build hierarchical structure from flat list."""
     root_items = []
-    stack = []
+    
+    # parents[level] is the item a header at that level nests under; each
+    # item becomes the parent for every deeper level until it is superseded
+    depth = max((item.level for item in structure), default=0) + 1
+    parents: List[Optional[ParsedHeader]] = [None] * depth
     
     for item in structure:
-        level = item['level']
+        level = item.level
+        parent = parents[level]
         
-        # Pop stack until we find the right parent level
-        while stack and stack[-1]['level'] >= level:
-            stack.pop()
-        
-        if stack:
-            # Add as child to parent
-            stack[-1]['children'].append(item)
-        else:
+        if parent is None:
             # Root level item
             root_items.append(item)
+        else:
+            # Add as child to parent
+            parent.children.append(item)
         
-        stack.append(item)
+        parents[level + 1:] = [item] * (depth - level - 1)
     
     return root_items
 
-def _generate_item_output(item: Dict[str, Any], result: List[str], quantities: Dict[str, int], path: List[str]) -> None:
-    """Generate output for a single item and its children."""
-    current_path = path + [item['name']]
-    path_key = '.'.join(current_path)
+def _generate_item_output(item: ParsedHeader, result: List[str], quantities: Dict[str, int], path: List[str]) -> None:
+    """Generate output for a single item and its children.
+    
+    path holds the names of the enclosing items; the item's name is pushed
+    for the duration of the call and popped before returning.
+    """
+    level = item.level
+    name = item.name
+    children = item.children
+    hashes = _HASHES[level] if level < len(_HASHES) else '#' * level
+    is_level1 = level == 1
+    
+    path.append(name)
+    path_key = '.'.join(path)
     
     # Determine how many instances to generate
-    if item['cardinality']['type'] == 'unlimited':
+    card_type = item.card_type
+    if card_type == 'unlimited':
         count = quantities.get(path_key, 2)  # Default to 2 for unlimited
-    elif item['cardinality']['type'] == 'range':
-        count = quantities.get(path_key, item['cardinality']['min'])
+    elif card_type == 'range':
+        count = quantities.get(path_key, item.card_min)
     else:
-        count = item['cardinality']['count']
+        count = item.card_count
     
     # Generate instances
-    if count == 1 and not item['children']:
+    if count == 1 and not children:
         # Single field
-        header = '#' * item['level'] + ' ' + item['name'] + ' | '
-        result.append(header)
-        if item['level'] == 1:
-            result.append('')  # Extra line after top-level
-    elif count == 1 and item['children']:
+        if is_level1:
+            result.extend((f'{hashes} {name} | ', ''))  # Extra line after top-level
+        else:
+            result.append(f'{hashes} {name} | ')
+    elif count == 1 and children:
         # Single container
-        header = '#' * item['level'] + ' ' + item['name']
-        result.append(header)
-        if item['level'] == 1:
-            result.append('')  # Extra line after top-level
+        if is_level1:
+            result.extend((f'{hashes} {name}', ''))  # Extra line after top-level
+        else:
+            result.append(f'{hashes} {name}')
         
         # Generate children
-        for child in item['children']:
-            _generate_item_output(child, result, quantities, current_path)
+        for child in children:
+            _generate_item_output(child, result, quantities, path)
     else:
         # Multiple instances
+        # Special case for numbered chapters
+        is_chapter = level == 2 and 'chapter' in name.lower()
         for i in range(count):
-            if item['children']:
+            if children:
                 # Container with children
-                if item['level'] == 2:
-                    # Special case for numbered chapters
-                    if 'chapter' in item['name'].lower():
-                        header = '#' * item['level'] + ' ' + item['name'] + ' ' + str(i + 1)
-                    else:
-                        header = '#' * item['level'] + ' ' + item['name']
-                else:
-                    header = '#' * item['level'] + ' ' + item['name']
-                
+                header = f'{hashes} {name} {i + 1}' if is_chapter else f'{hashes} {name}'
                 result.append(header)
                 
                 # Generate children
-                for child in item['children']:
-                    _generate_item_output(child, result, quantities, current_path)
+                for child in children:
+                    _generate_item_output(child, result, quantities, path)
                 
-                if item['level'] == 1:
+                if is_level1:
                     result.append('')  # Extra line after top-level containers
             else:
                 # Simple repeated field
-                header = '#' * item['level'] + ' ' + item['name'] + ' | '
-                result.append(header)
+                result.append(f'{hashes} {name} | ')
+    
+    path.pop()
 
 def parse_worksheet_content(worksheet_content: str, section_name: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -254,19 +330,26 @@ def parse_worksheet_content(worksheet_content: str, section_name: Optional[str]
             }
         }
     """
-    lines = worksheet_content.strip().split('\n')
+    raw_lines = worksheet_content.strip().split('\n')
+    lines = [raw_line.strip() for raw_line in raw_lines]
+    line_count = len(lines)
     sections = {}
     current_section = None
     current_content = []
     current_field = None
     current_field_content = []
     
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
+    numbered_lines = enumerate(lines)
+    for i, line in numbered_lines:
+        # Regular content line (including blank lines)
+        if not line or line[0] != '#':
+            current_content.append(line)
+            if current_field:
+                current_field_content.append(line)
+            continue
         
         # Check for section header (H1 followed by ---)
-        if line.startswith('# ') and i + 1 < len(lines) and lines[i + 1].strip() == '---':
+        if line[1:2] == ' ' and i + 1 < line_count and lines[i + 1] == '---':
             # Save previous section if exists
             if current_section:
                 _finalize_section(sections, current_section, current_content, current_field, current_field_content)
@@ -278,29 +361,39 @@ def parse_worksheet_content(worksheet_content: str, section_name: Optional[str]
                 'content': [],
                 'fields': {}
             }
-            current_content = [line, lines[i + 1]]  # Include the header and separator
+            current_content = [line, raw_lines[i + 1]]  # Include the header and separator
             current_field = None
             current_field_content = []
-            i += 2  # Skip the --- line
+            next(numbered_lines)  # Skip the --- line
             continue
         
         # Check for field headers (any level # ending with |)
-        if line.startswith('#') and line.endswith('|'):
+        if line[-1] == '|':
             # Save previous field if exists
             if current_field and current_section:
                 field_content = '\n'.join(current_field_content).strip()
                 current_section['fields'][current_field] = field_content
             
-            # Start new field
-            header_match = re.match(r'^(#+)\s*(.+?)\s*\|\s*(.*)$', line)
-            if header_match:
-                field_name = header_match.group(2).strip()
+            # Start new field; the name runs up to the first '|' after it
+            field_text = line.lstrip('#').lstrip()
+            if len(field_text) > 1:
+                field_name = field_text[:field_text.find('|', 1)].strip()
+            elif line[-2] != '#':
+                # '# |': a field with no name
+                field_name = ''
+            elif len(line) > 2:
+                # '##|': the name takes the last '#'
+                field_name = '#'
+            else:
+                # '#|' does not start a field
+                field_name = None
+            if field_name is not None:
                 current_field = field_name
                 current_field_content = []
                 current_content.append(line)
         
-        # Check for regular headers (structure headers without |)
-        elif line.startswith('#'):
+        # Regular headers (structure headers without |)
+        else:
             # Save previous field if exists
             if current_field and current_section:
                 field_content = '\n'.join(current_field_content).strip()
@@ -309,14 +402,6 @@ def parse_worksheet_content(worksheet_content: str, section_name: Optional[str]
                 current_field_content = []
             
             current_content.append(line)
-        
-        # Regular content line
-        else:
-            current_content.append(line)
-            if current_field:
-                current_field_content.append(line)
-        
-        i += 1
     
     # Finalize last section
     if current_section: